@@ -1,13 +1,19 @@
+import asyncio
 import pytest
-import aiohttp
 import gzip
+import io
+import sys
+import time
+from concurrent.futures.process import BrokenProcessPool
+import robotexclusionrulesparser
 from bs4 import BeautifulSoup
-from website_checker import WebsiteChecker
+import website_checker
+from website_checker import WebsiteChecker, _sitemap_kind, create_session
 import pytest_asyncio
 
 @pytest_asyncio.fixture
 async def google_checker():
-    async with aiohttp.ClientSession() as session:
+    async with create_session() as session:
         yield WebsiteChecker("https://google.com", session)
 
 @pytest.mark.asyncio
@@ -60,6 +66,49 @@ async def test_compressed_sitemap_handling(google_checker):
     assert isinstance(decompressed, str)
     assert "gmail/sitemap.xml" in decompressed
 
+class FakeStreamReader:
+    """Stand-in for aiohttp's response.content that yields fixed-size chunks"""
+
+    def __init__(self, data, chunk_size=7):
+        self.data = data
+        self.chunk_size = chunk_size
+
+    async def iter_chunked(self, n):
+        for start in range(0, len(self.data), self.chunk_size):
+            yield self.data[start:start + self.chunk_size]
+
+
+class FakeResponse:
+    def __init__(self, data):
+        self.content = FakeStreamReader(data)
+
+
+@pytest.mark.asyncio
+async def test_gzip_stream_decompression(google_checker):
+    """Test streaming decompression of single, multi-member and padded gzip bodies"""
+    first = b"<urlset><url><loc>https://www.google.com/a</loc></url>"
+    second = b"<url><loc>https://www.google.com/b</loc></url></urlset>"
+
+    single = await google_checker.read_gzip_stream(FakeResponse(gzip.compress(first)))
+    assert single == first
+
+    multi = gzip.compress(first) + gzip.compress(second)
+    assert await google_checker.read_gzip_stream(FakeResponse(multi)) == first + second
+
+    padded = gzip.compress(first) + b"\0" * 16
+    assert await google_checker.read_gzip_stream(FakeResponse(padded)) == first
+
+    padded_multi = gzip.compress(first) + b"\0" * 16 + gzip.compress(second)
+    assert await google_checker.read_gzip_stream(FakeResponse(padded_multi)) == first + second
+
+
+@pytest.mark.asyncio
+async def test_truncated_gzip_stream(google_checker):
+    """Test that a truncated gzip body raises instead of returning partial XML"""
+    compressed = gzip.compress(b"<urlset>" + b"<url><loc>https://www.google.com/</loc></url>" * 50)
+    with pytest.raises(EOFError):
+        await google_checker.read_gzip_stream(FakeResponse(compressed[:-20]))
+
 @pytest.mark.asyncio
 async def test_url_allowed_by_robots(google_checker):
     """Test URL permission checking against robots.txt"""
@@ -91,6 +140,43 @@ async def test_sitemap_index_handling(google_checker):
     assert isinstance(urls, list)
     assert "https://www.google.com/gmail/sitemap.xml" in urls
 
+@pytest.mark.asyncio
+async def test_urlset_handling(google_checker):
+    """Test handling of regular urlset sitemaps, with and without namespace"""
+    sample_urlset = b"""<?xml version="1.0" encoding="UTF-8"?>
+    <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+        <url><loc>https://www.google.com/about</loc></url>
+        <url><loc>https://www.google.com/gmail</loc></url>
+    </urlset>"""
+    urls = google_checker.parse_sitemap_urls(sample_urlset)
+    assert urls == ["https://www.google.com/about", "https://www.google.com/gmail"]
+
+    plain_urlset = "<urlset><url><loc>https://www.google.com/maps</loc></url></urlset>"
+    assert google_checker.parse_sitemap_urls(plain_urlset) == ["https://www.google.com/maps"]
+
+    duplicated = b"""<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+        <url><loc>https://www.google.com/maps</loc></url>
+        <url><loc>https://www.google.com/about</loc></url>
+        <url><loc>https://www.google.com/maps</loc></url>
+    </urlset>"""
+    assert google_checker.parse_sitemap_urls(duplicated) == [
+        "https://www.google.com/maps",
+        "https://www.google.com/about",
+    ]
+
+@pytest.mark.asyncio
+async def test_streaming_sitemap_parsing(google_checker):
+    """Test that sitemap URLs can be consumed lazily"""
+    entries = "".join(
+        f"<url><loc>https://www.google.com/page{i}</loc></url>" for i in range(1000)
+    )
+    sample_urlset = (
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + entries + "</urlset>"
+    )
+    urls = google_checker.iter_sitemap_urls(sample_urlset)
+    assert next(urls) == "https://www.google.com/page0"
+    assert len(list(urls)) == 999
+
 @pytest.mark.asyncio
 async def test_invalid_sitemap_handling(google_checker):
     """Test handling of invalid sitemap content"""
@@ -104,3 +190,222 @@ async def test_connection_error_handling(google_checker):
     invalid_url = "https://invalid.example.com/sitemap.xml"
     content = await google_checker.fetch_sitemap(invalid_url)
     assert content is None
+
+@pytest.mark.asyncio
+async def test_concurrent_fetch_error_handling(google_checker):
+    """Test that failed concurrent fetches keep their position in the results"""
+    invalid_urls = [
+        "https://invalid.example.com/sitemap.xml",
+        "https://invalid.example.com/sitemap_index.xml",
+    ]
+    contents = await google_checker.fetch_sitemaps(invalid_urls)
+    assert contents == [None, None]
+    assert await google_checker.probe_urls(invalid_urls) == [False, False]
+
+@pytest.mark.asyncio
+async def test_content_validation(google_checker):
+    """Test sitemap and robots.txt validation against soft-404 pages"""
+    html_page = "<!DOCTYPE html><html><body>Not found</body></html>"
+    assert not google_checker.is_valid_sitemap(html_page.encode())
+    assert not google_checker.is_valid_robots_txt(html_page)
+
+    sitemap = b'<?xml version="1.0" encoding="UTF-8"?>\n<urlset xmlns="x"></urlset>'
+    assert google_checker.is_valid_sitemap(sitemap)
+    assert google_checker.is_valid_robots_txt("User-agent: *\nDisallow: /search")
+    # Empty and comment-only files are valid and allow everything
+    assert google_checker.is_valid_robots_txt("")
+    assert google_checker.is_valid_robots_txt("# Nothing to see here\n")
+    assert google_checker.is_valid_robots_txt("\ufeffUser-agent: *\nDisallow: /search")
+    assert website_checker.ROBOTS_DIRECTIVE_RE.search("\ufeffDisallow: /search")
+
+@pytest.mark.asyncio
+async def test_robots_txt_cache(monkeypatch):
+    """Test that robots.txt is reused per host without re-fetching"""
+    robots_txt = "User-agent: *\nDisallow: /private\nSitemap: https://example.org/sitemap.xml\n"
+    robots_url = "https://example.org/robots.txt"
+    robots_parser = website_checker._CachingRobotsParser()
+    robots_parser.parse(robots_txt)
+    website_checker._ROBOTS_CACHE[robots_url] = (time.monotonic(), robots_txt, robots_parser)
+    try:
+        # No session: any network access would fail
+        checker = WebsiteChecker("https://example.org/blog")
+        assert checker.robots_url == robots_url
+        # Cached rules are copied, never parsed again
+        monkeypatch.setattr(website_checker._CachingRobotsParser, "parse", None)
+        assert await checker.fetch_robots_txt() == robots_txt
+        assert await checker.find_sitemaps_in_robots() == ["https://example.org/sitemap.xml"]
+        assert not checker.is_url_allowed("https://example.org/private/page")
+        monkeypatch.undo()
+
+        # Each checker gets its own parser, so changing one leaves the other alone
+        other = WebsiteChecker("https://example.org")
+        await other.fetch_robots_txt()
+        assert other.robots_parser is not checker.robots_parser
+        checker.robots_parser.parse("User-agent: *\nDisallow:\n")
+        assert not other.is_url_allowed("https://example.org/private/page")
+    finally:
+        del website_checker._ROBOTS_CACHE[robots_url]
+
+@pytest.mark.asyncio
+async def test_batch_url_allowed(google_checker):
+    """Test batch URL permission checking against robots.txt rules"""
+    google_checker.robots_parser.parse("User-agent: *\nDisallow: /search\n")
+    urls = [
+        "https://www.google.com/about",
+        "https://www.google.com/search?q=test",
+        "https://google.com/search?q=test",
+        "https://www.google.com/",
+    ]
+    assert google_checker.check_urls_allowed(urls) == [True, False, False, True]
+    assert google_checker.check_urls_allowed(urls) == [
+        google_checker.is_url_allowed(url) for url in urls
+    ]
+
+    google_checker.robots_parser = robotexclusionrulesparser.RobotExclusionRulesParser()
+    google_checker.robots_parser.parse("User-agent: *\nDisallow: //private\n")
+    assert google_checker.check_urls_allowed(["https://www.google.com//private/page"]) == [False]
+    assert not google_checker.is_url_allowed("https://www.google.com//private/page")
+
+@pytest.mark.asyncio
+async def test_sitemap_hierarchy_crawl(google_checker):
+    """Test breadth-first processing of nested sitemap indexes"""
+    def index(*locs):
+        entries = "".join(f"<sitemap><loc>{loc}</loc></sitemap>" for loc in locs)
+        return f"<sitemapindex>{entries}</sitemapindex>".encode()
+
+    prefetched = {
+        "https://www.google.com/sitemap.xml": index(
+            "https://www.google.com/a.xml", "https://www.google.com/b.xml"
+        ),
+        "https://www.google.com/a.xml": index("https://www.google.com/c.xml.gz"),
+        # Content URLs are never crawled, whatever their extension
+        "https://www.google.com/b.xml": (
+            b"<urlset><url><loc>https://www.google.com/b.xml</loc></url></urlset>"
+        ),
+        # Cycles back to the root must not be fetched again
+        "https://www.google.com/c.xml.gz": index("https://www.google.com/sitemap.xml"),
+    }
+    results = await google_checker.crawl_sitemaps(
+        ["https://www.google.com/sitemap.xml"], prefetched
+    )
+    assert list(results) == [
+        "https://www.google.com/sitemap.xml",
+        "https://www.google.com/a.xml",
+        "https://www.google.com/b.xml",
+        "https://www.google.com/c.xml.gz",
+    ]
+    assert results["https://www.google.com/b.xml"] == ("urlset", ["https://www.google.com/b.xml"])
+
+@pytest.mark.asyncio
+async def test_sitemap_crawl_depth_limit(google_checker, monkeypatch):
+    """Test that nested sitemap indexes are only followed a few levels deep"""
+    monkeypatch.setattr(website_checker, "MAX_SITEMAP_DEPTH", 1)
+    prefetched = {
+        f"https://www.google.com/{i}.xml": (
+            f"<sitemapindex><sitemap><loc>https://www.google.com/{i + 1}.xml</loc>"
+            "</sitemap></sitemapindex>"
+        ).encode()
+        for i in range(3)
+    }
+    results = await google_checker.crawl_sitemaps(["https://www.google.com/0.xml"], prefetched)
+    assert list(results) == ["https://www.google.com/0.xml", "https://www.google.com/1.xml"]
+
+@pytest.mark.asyncio
+async def test_sitemap_crawl_survives_errors(google_checker, monkeypatch):
+    """Test that a failing sitemap does not stop the crawl workers"""
+    async def broken_parse(content):
+        raise BrokenProcessPool("worker died")
+
+    monkeypatch.setattr(google_checker, "parse_sitemap_async", broken_parse)
+    # More failing sitemaps than workers
+    urls = [f"https://www.google.com/sitemap{i}.xml" for i in range(20)]
+    prefetched = dict.fromkeys(urls, b"<urlset></urlset>")
+    results = await asyncio.wait_for(google_checker.crawl_sitemaps(urls, prefetched), timeout=5)
+    assert results == dict.fromkeys(urls)
+
+def test_write_listing(capsysbinary, monkeypatch):
+    """Test writing tagged listings with and without a binary stdout"""
+    lines = [b"[OK] https://example.org/a\n", b"[BLOCKED] https://example.org/b\n"]
+    print("Header")
+    website_checker.write_listing(lines)
+    assert capsysbinary.readouterr().out == b"Header\n" + b"".join(lines)
+
+    text_stdout = io.StringIO()
+    monkeypatch.setattr(sys, "stdout", text_stdout)
+    website_checker.write_listing(lines)
+    assert text_stdout.getvalue() == b"".join(lines).decode()
+
+def test_sitemap_kind_detection():
+    """Test classifying sitemaps by their root element"""
+    assert _sitemap_kind(b'<?xml version="1.0"?>\n<sitemapindex xmlns="x">') == "sitemapindex"
+    assert _sitemap_kind(b'<urlset xmlns="x"><url><loc>https://www.google.com/</loc>') == "urlset"
+    assert _sitemap_kind(b'<rss version="2.0"><channel>') == "rss"
+    assert _sitemap_kind(b"<html><body>Not found</body></html>") == ""
+    assert _sitemap_kind(b"") == ""
+
+    # Markers before the root element must not decide the kind
+    sitemap = (
+        b'<?xml version="1.0"?><!-- this used to be a <urlset> -->'
+        b'<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        b'<sitemap><loc>http://x/s.xml</loc></sitemap></sitemapindex>'
+    )
+    assert _sitemap_kind(sitemap) == "sitemapindex"
+    assert website_checker._parse_sitemap_bytes(sitemap) == ["http://x/s.xml"]
+
+@pytest.mark.asyncio
+async def test_url_allowed_cache_reset(google_checker):
+    """Test that cached robots.txt verdicts are dropped when rules change"""
+    url = "https://www.google.com/search?q=test"
+    assert google_checker.is_url_allowed(url)
+
+    # Re-parsing the checker's parser in place
+    google_checker.robots_parser.parse("User-agent: *\nDisallow: /search\n")
+    assert not google_checker.is_url_allowed(url)
+    google_checker.robots_parser.parse("User-agent: *\nDisallow:\n")
+    assert google_checker.is_url_allowed(url)
+
+    # Assigning a parser created elsewhere
+    parser = robotexclusionrulesparser.RobotExclusionRulesParser()
+    parser.parse("User-agent: *\nDisallow: /search\n")
+    google_checker.robots_parser = parser
+    assert not google_checker.is_url_allowed(url)
+
+@pytest.mark.asyncio
+async def test_large_sitemap_parsing(google_checker):
+    """Test that sitemaps above the process pool threshold parse the same"""
+    entries = "".join(
+        f"<url><loc>https://www.google.com/page{i}</loc></url>" for i in range(30000)
+    )
+    sample_urlset = (
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">' + entries + "</urlset>"
+    ).encode()
+    assert len(sample_urlset) >= website_checker.PROCESS_POOL_THRESHOLD
+    try:
+        urls = await google_checker.parse_sitemap_urls_async(sample_urlset)
+    finally:
+        website_checker.shutdown_parse_pool()
+    assert urls == google_checker.parse_sitemap_urls(sample_urlset)
+    assert len(urls) == 30000
+
+@pytest.mark.asyncio
+async def test_broken_parse_pool_replaced(google_checker):
+    """Test that a dead process pool is replaced instead of reused"""
+    class BrokenPool:
+        def submit(self, *args):
+            raise BrokenProcessPool("worker died")
+
+        def shutdown(self, wait=True):
+            pass
+
+    sample_urlset = (
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">'
+        + "<url><loc>https://www.google.com/page</loc></url>" * 30000
+        + "</urlset>"
+    ).encode()
+    broken = website_checker._PARSE_POOL = BrokenPool()
+    try:
+        kind, urls = await google_checker.parse_sitemap_async(sample_urlset)
+        assert website_checker._PARSE_POOL is not broken
+    finally:
+        website_checker.shutdown_parse_pool()
+    assert (kind, urls) == ("urlset", ["https://www.google.com/page"])
@@ -21,15 +21,273 @@ Example:
 
 import aiohttp
 import asyncio
+import copy
+import functools
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urlparse, urlunparse
 import sys
-from bs4 import BeautifulSoup
-from typing import Optional, Tuple, List, Dict
+import time
+from typing import BinaryIO, Optional, Tuple, List, Dict, Iterable, Iterator, Union
 import robotexclusionrulesparser
 import gzip
 import io
-import xml.etree.ElementTree as ET
+import re
+import zlib
+from lxml import etree
+
+SITEMAP_NS = "http://www.sitemaps.org/schemas/sitemap/0.9"
+# Tags are built once at import; <loc> is matched with or without namespace
+SITEMAP_ENTRY_TAGS = (
+    f"{{{SITEMAP_NS}}}sitemap",
+    f"{{{SITEMAP_NS}}}url",
+    'sitemap',
+    'url',
+)
+SITEMAP_LOC_TAGS = frozenset((f"{{{SITEMAP_NS}}}loc", 'loc'))
+# Entry tags to stream for each kind of sitemap root
+SITEMAP_KIND_TAGS = {
+    'sitemapindex': (f"{{{SITEMAP_NS}}}sitemap", 'sitemap'),
+    'urlset': (f"{{{SITEMAP_NS}}}url", 'url'),
+}
+# Ask for compressed transfers; aiohttp decodes Content-Encoding transparently
+DEFAULT_HEADERS = {'Accept-Encoding': 'gzip, deflate'}
+# Chunk size used when streaming compressed sitemaps off the wire
+GZIP_CHUNK_SIZE = 64 * 1024
+# Validation only looks at the start of a document; root elements and
+# robots.txt directives are expected well within this many characters
+VALIDATION_HEAD_SIZE = 4096
+SITEMAP_MARKERS = (b'<urlset', b'<sitemapindex', b'<rss', b'<feed')
+SITEMAP_ROOT_KINDS = frozenset(('urlset', 'sitemapindex', 'rss', 'feed'))
+ROBOTS_DIRECTIVE_RE = re.compile(
+    r'^\ufeff?[ \t]*(?:user-agent|disallow|allow|sitemap)[ \t]*:',
+    re.IGNORECASE | re.MULTILINE,
+)
+# Seconds a fetched robots.txt stays valid in the per-host cache
+ROBOTS_CACHE_TTL = 3600
+# Sitemaps this large (in bytes) are parsed in a separate process
+PROCESS_POOL_THRESHOLD = 1024 * 1024
+# Created lazily by _get_parse_pool, since most runs never need it
+_PARSE_POOL: Optional[ProcessPoolExecutor] = None
+# Distinct URL paths whose robots.txt verdict is remembered per parser
+ROBOTS_PATH_CACHE_SIZE = 4096
+# Upper bound on simultaneous requests to the analyzed website
+MAX_CONCURRENT_FETCHES = 16
+# Levels of nested sitemap indexes followed below the starting sitemaps
+MAX_SITEMAP_DEPTH = 3
+# Statuses with which servers reject HEAD itself; such locations are fetched anyway
+HEAD_UNSUPPORTED_STATUSES = (405, 501)
+COMMON_SITEMAP_PATHS = [
+    '/sitemap.xml',
+    '/sitemap_index.xml',
+    '/wp-sitemap.xml',
+    '/sitemap.php',
+]
+
+
+def _sitemap_kind(content: bytes) -> str:
+    """Classify a sitemap by its root element.
+
+    Parsing stops at the root's start tag, so the cost does not grow with
+    the size of the document, and markers in comments or the prolog are
+    never mistaken for the root.
+
+    Args:
+        content (bytes): The document, or at least its start
+
+    Returns:
+        str: 'urlset', 'sitemapindex', 'rss' or 'feed', or an empty string
+        for any other root
+    """
+    context = etree.iterparse(
+        io.BytesIO(content), events=('start',), recover=True, resolve_entities=False
+    )
+    try:
+        for _, root in context:
+            kind = etree.QName(root).localname
+            return kind if kind in SITEMAP_ROOT_KINDS else ''
+    except etree.LxmlError:
+        pass
+    return ''
+
+
+def _robots_path(url: str) -> str:
+    """Reduce a URL to the part robots.txt rules apply to.
+
+    Args:
+        url (str): The URL to reduce
+
+    Returns:
+        str: The URL without its scheme and host
+    """
+    # Not fit to hand to the robots.txt parser as is: it re-parses its input,
+    # and a path starting with '//' would be read as a host; see _is_path_allowed
+    return urlunparse(('', '') + tuple(urlparse(url))[2:])
+
+
+def _is_path_allowed(
+    parser: robotexclusionrulesparser.RobotExclusionRulesParser, path: str
+) -> bool:
+    """Evaluate robots.txt rules for a path produced by _robots_path."""
+    # A placeholder scheme and host keep paths like '//private' from being
+    # read as a host when the parser splits the URL again
+    return bool(parser.is_allowed("*", "http://h" + path))
+
+
+class _CachingRobotsParser(robotexclusionrulesparser.RobotExclusionRulesParser):
+    """RobotExclusionRulesParser that remembers its verdict per URL path.
+
+    The remembered verdicts are dropped every time new rules are parsed,
+    so re-parsing in place never leaves stale answers behind.
+    """
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._new_path_cache()
+
+    def _new_path_cache(self) -> None:
+        self.is_path_allowed = functools.lru_cache(maxsize=ROBOTS_PATH_CACHE_SIZE)(
+            functools.partial(_is_path_allowed, self)
+        )
+
+    def __copy__(self) -> "_CachingRobotsParser":
+        # parse() rebinds the rule lists instead of mutating them, so sharing
+        # them is safe; the verdict cache must evaluate against the copy
+        clone = self.__class__.__new__(self.__class__)
+        clone.__dict__.update(self.__dict__)
+        clone._new_path_cache()
+        return clone
+
+    def parse(self, s: str) -> None:
+        super().parse(s)
+        self.is_path_allowed.cache_clear()
+
+
+def _iter_sitemap_urls(content: bytes, kind: str) -> Iterator[str]:
+    """Stream unique URLs from sitemap bytes; see WebsiteChecker.iter_sitemap_urls."""
+    # Only stream the entry type the root calls for; fall back to both
+    # when the root is not a sitemap root
+    context = etree.iterparse(
+        io.BytesIO(content),
+        events=('end',),
+        tag=SITEMAP_KIND_TAGS.get(kind, SITEMAP_ENTRY_TAGS),
+        recover=True,
+        resolve_entities=False,
+    )
+    seen = set()
+    try:
+        for _, elem in context:
+            for child in elem:
+                if child.tag in SITEMAP_LOC_TAGS:
+                    url = child.text.strip() if child.text else None
+                    if url and url not in seen:
+                        seen.add(url)
+                        yield url
+                    break
+            # Drop the entry and any already-processed siblings
+            elem.clear()
+            while elem.getprevious() is not None:
+                del elem.getparent()[0]
+    except etree.LxmlError as e:
+        print(f"Error parsing sitemap: {e}")
+
+
+def _parse_sitemap_bytes(content: bytes) -> List[str]:
+    """Parse unique URLs from sitemap bytes; module-level so it can be pickled."""
+    return list(_iter_sitemap_urls(content, _sitemap_kind(content)))
+
+
+def _parse_sitemap_with_kind(content: bytes) -> Tuple[str, List[str]]:
+    """Classify and parse sitemap bytes; module-level so it can be pickled."""
+    kind = _sitemap_kind(content)
+    return kind, list(_iter_sitemap_urls(content, kind))
+
+
+def _sub_sitemaps(url: str, parsed: Optional[Tuple[str, List[str]]], depth: int) -> List[str]:
+    """Pick the sitemaps to crawl next from one that WebsiteChecker.crawl_sitemaps parsed.
+
+    Only the entries of a sitemap index are sitemaps themselves, whatever
+    their extension. Indexes nested too deeply are reported and not followed.
+    """
+    if not parsed or parsed[0] != 'sitemapindex':
+        return []
+    if depth >= MAX_SITEMAP_DEPTH:
+        print(f"Not following sub-sitemaps of {url}: nested too deeply")
+        return []
+    return parsed[1]
+
+
+def _get_parse_pool() -> ProcessPoolExecutor:
+    """Return the process pool for large sitemaps, creating it on first use."""
+    global _PARSE_POOL
+    if _PARSE_POOL is None:
+        # Never fork: the pool is started from inside a running event loop
+        # whose resolver threads may be holding locks
+        start_method = (
+            'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+        )
+        _PARSE_POOL = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), mp_context=multiprocessing.get_context(start_method)
+        )
+    return _PARSE_POOL
+
+
+def _discard_parse_pool(pool: ProcessPoolExecutor) -> None:
+    """Drop a broken process pool so the next large sitemap starts a new one."""
+    global _PARSE_POOL
+    # Another task may already have replaced it
+    if _PARSE_POOL is pool:
+        _PARSE_POOL = None
+    pool.shutdown(wait=False)
+
+
+async def _parse_in_pool(content: bytes) -> Tuple[str, List[str]]:
+    """Classify and parse sitemap bytes in the process pool."""
+    pool = _get_parse_pool()
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, _parse_sitemap_with_kind, content)
+    except BrokenProcessPool:
+        _discard_parse_pool(pool)
+        raise
+
+
+def shutdown_parse_pool() -> None:
+    """Shut down the process pool for large sitemaps, if it was started."""
+    global _PARSE_POOL
+    if _PARSE_POOL is not None:
+        _PARSE_POOL.shutdown()
+        _PARSE_POOL = None
+
+
+def create_session() -> aiohttp.ClientSession:
+    """Create an HTTP session tuned for many requests to one website.
+
+    Connections and DNS lookups are kept alive between requests, so
+    robots.txt and every sitemap of a host share the same TCP/TLS
+    connections instead of handshaking again for each fetch.
+
+    Returns:
+        aiohttp.ClientSession: A new client session
+    """
+    connector = aiohttp.TCPConnector(
+        limit=100,
+        limit_per_host=8,
+        ttl_dns_cache=300,
+        keepalive_timeout=60,
+        enable_cleanup_closed=True,
+    )
+    return aiohttp.ClientSession(
+        connector=connector, headers=DEFAULT_HEADERS, auto_decompress=True
+    )
+
+
+# robots.txt per "scheme://host": (fetched at, content, parsed rules)
+_ROBOTS_CACHE: Dict[str, Tuple[float, Optional[str], _CachingRobotsParser]] = {}
+
 
 class WebsiteChecker:
     """A class to check and analyze website sitemaps and robots.txt files.
@@ -55,7 +313,11 @@ class WebsiteChecker:
             session (Optional[aiohttp.ClientSession]): HTTP client session for making requests
         """
         self.base_url = base_url.rstrip('/')
-        self.robots_parser = robotexclusionrulesparser.RobotExclusionRulesParser()
+        self.robots_parser: robotexclusionrulesparser.RobotExclusionRulesParser = (
+            _CachingRobotsParser()
+        )
+        # Set once fetch_robots_txt has filled robots_parser
+        self._robots_loaded = False
         self.sitemap_urls = []
         self.session = session
         self._own_session = False
@@ -63,7 +325,7 @@ class WebsiteChecker:
     async def __aenter__(self):
         """Async context manager entry."""
         if self.session is None:
-            self.session = aiohttp.ClientSession()
+            self.session = create_session()
             self._own_session = True
         return self
 
@@ -72,53 +334,310 @@ class WebsiteChecker:
         if self._own_session and self.session:
             await self.session.close()
 
+    @property
+    def robots_url(self) -> str:
+        """The URL of the website's robots.txt, which always lives at the host root."""
+        parsed_url = urlparse(self.base_url)
+        return f"{parsed_url.scheme}://{parsed_url.netloc}/robots.txt"
+
     async def fetch_robots_txt(self) -> Optional[str]:
         """Fetch and parse the robots.txt file.
-        
+
+        The file and its parsed rules are cached per scheme and host for
+        ``ROBOTS_CACHE_TTL`` seconds, so repeated lookups for the same website
+        neither re-fetch nor re-parse it. Each checker gets its own copy of
+        the cached parser as ``robots_parser``.
+
         Returns:
             Optional[str]: The contents of robots.txt if found, None otherwise
         """
-        robots_url = f"{self.base_url}/robots.txt"
-        try:
-            async with self.session.get(robots_url) as response:
-                if response.status == 200:
-                    return await response.text()
-        except Exception as e:
-            print(f"Error fetching robots.txt: {e}")
-        return None
+        robots_url = self.robots_url
+        cached = _ROBOTS_CACHE.get(robots_url)
+        if cached and time.monotonic() - cached[0] < ROBOTS_CACHE_TTL:
+            _, content, robots_parser = cached
+        else:
+            try:
+                async with self.session.get(robots_url) as response:
+                    content = None
+                    if response.status == 200:
+                        text = await response.text()
+                        if self.is_valid_robots_txt(text):
+                            content = text
+            except Exception as e:
+                print(f"Error fetching robots.txt: {e}")
+                return None
+            robots_parser = _CachingRobotsParser()
+            if content:
+                robots_parser.parse(content)
+            _ROBOTS_CACHE[robots_url] = (time.monotonic(), content, robots_parser)
+
+        self.robots_parser = copy.copy(robots_parser)
+        self._robots_loaded = True
+        return content
 
     async def find_sitemaps_in_robots(self) -> List[str]:
         """Find sitemap URLs listed in robots.txt.
-        
+
+        robots.txt is only fetched if this checker has not loaded it yet.
+
         Returns:
             List[str]: List of sitemap URLs found in robots.txt
         """
-        robots_content = await self.fetch_robots_txt()
-        if robots_content:
-            self.robots_parser.parse(robots_content)
-            return self.robots_parser.sitemaps
-        return []
+        if not self._robots_loaded:
+            await self.fetch_robots_txt()
+        # A copy, since the parser's own list is shared with the cache
+        return list(self.robots_parser.sitemaps)
 
-    async def fetch_sitemap(self, url: str) -> Optional[str]:
+    async def fetch_sitemap(self, url: str) -> Optional[bytes]:
         """Fetch a sitemap from the given URL.
-        
+
+        The raw bytes are returned undecoded; the XML parser detects the
+        encoding from the document's XML declaration.
+
         Args:
             url (str): The URL of the sitemap to fetch
             
         Returns:
-            Optional[str]: The contents of the sitemap if found, None otherwise
+            Optional[bytes]: The contents of the sitemap if found, None otherwise
         """
         try:
             async with self.session.get(url) as response:
                 if response.status == 200:
-                    content = await response.read()
-                    if url.endswith('.gz'):
-                        return self.decompress_gzip(content)
-                    return content.decode('utf-8')
+                    # Only .gz files need manual decompression; gzip transfer
+                    # encoding has already been undone by aiohttp
+                    encoding = response.headers.get(aiohttp.hdrs.CONTENT_ENCODING, '')
+                    if url.endswith('.gz') and 'gzip' not in encoding.lower():
+                        return await self.read_gzip_stream(response)
+                    return await response.read()
         except Exception as e:
             print(f"Error fetching sitemap {url}: {e}")
         return None
 
+    async def read_gzip_stream(self, response: aiohttp.ClientResponse) -> bytes:
+        """Decompress a gzipped response body as it arrives.
+
+        Chunks are fed to a zlib decompressor while the download is still in
+        progress, so the compressed body is never buffered as a whole.
+
+        Args:
+            response (aiohttp.ClientResponse): The response to read from
+
+        Returns:
+            bytes: The decompressed content
+
+        Raises:
+            EOFError: If the body ends before the end of the last gzip member
+        """
+        chunks = []
+        decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+        async for chunk in response.content.iter_chunked(GZIP_CHUNK_SIZE):
+            while chunk:
+                if decompressor.eof:
+                    # Between members: skip zero padding, as gzip does, and
+                    # start on the next concatenated member if there is one
+                    chunk = chunk.lstrip(b'\0')
+                    if not chunk:
+                        break
+                    decompressor = zlib.decompressobj(wbits=zlib.MAX_WBITS | 16)
+                chunks.append(decompressor.decompress(chunk))
+                chunk = decompressor.unused_data
+        if not decompressor.eof:
+            raise EOFError("Compressed sitemap ended before the end-of-stream marker")
+        return b''.join(chunks)
+
+    async def fetch_sitemaps(self, urls: List[str]) -> List[Optional[bytes]]:
+        """Fetch several sitemaps concurrently.
+
+        At most ``MAX_CONCURRENT_FETCHES`` requests are in flight at once.
+
+        Args:
+            urls (List[str]): The URLs of the sitemaps to fetch
+
+        Returns:
+            List[Optional[bytes]]: The contents of each sitemap, in the same
+            order as ``urls``; None for sitemaps that could not be fetched
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+        async def fetch(url: str) -> Optional[bytes]:
+            async with semaphore:
+                return await self.fetch_sitemap(url)
+
+        return list(await asyncio.gather(*(fetch(url) for url in urls)))
+
+    async def probe_urls(self, urls: List[str]) -> List[bool]:
+        """Check concurrently which URLs exist, using HEAD requests.
+
+        Servers that refuse HEAD are given the benefit of the doubt, so the
+        caller can still fall back to a GET for those URLs.
+
+        Args:
+            urls (List[str]): The URLs to probe
+
+        Returns:
+            List[bool]: Whether each URL may exist, in the order given
+        """
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_FETCHES)
+
+        async def probe(url: str) -> bool:
+            async with semaphore:
+                try:
+                    async with self.session.head(url, allow_redirects=True) as response:
+                        return (
+                            response.status == 200
+                            or response.status in HEAD_UNSUPPORTED_STATUSES
+                        )
+                except Exception as e:
+                    print(f"Error probing {url}: {e}")
+                    return False
+
+        return list(await asyncio.gather(*(probe(url) for url in urls)))
+
+    async def find_sitemap_in_common_locations(self) -> Optional[Tuple[str, bytes]]:
+        """Probe the usual sitemap locations concurrently.
+
+        Returns:
+            Optional[Tuple[str, bytes]]: The URL and contents of the first
+            location (in ``COMMON_SITEMAP_PATHS`` order) that serves a
+            sitemap, None otherwise
+        """
+        urls = [self.base_url + path for path in COMMON_SITEMAP_PATHS]
+        available = await self.probe_urls(urls)
+        urls = [url for url, exists in zip(urls, available) if exists]
+        for url, content in zip(urls, await self.fetch_sitemaps(urls)):
+            if content and self.is_valid_sitemap(content):
+                return url, content
+        return None
+
+    async def crawl_sitemaps(
+        self, sitemap_urls: List[str], prefetched: Optional[Dict[str, bytes]] = None
+    ) -> Dict[str, Optional[Tuple[str, List[str]]]]:
+        """Fetch and parse a sitemap hierarchy breadth-first.
+
+        A pool of ``MAX_CONCURRENT_FETCHES`` workers takes sitemap URLs from a
+        queue and puts the entries of any sitemap index they find back on it,
+        so all sitemaps of one level are fetched in parallel. Indexes nested
+        more than ``MAX_SITEMAP_DEPTH`` levels below the starting sitemaps
+        are not followed. If robots.txt sets a crawl delay, requests are made
+        one at a time with that delay instead.
+
+        Args:
+            sitemap_urls (List[str]): The sitemaps to start from
+            prefetched (Optional[Dict[str, bytes]]): Contents already
+                downloaded for some of the sitemaps
+
+        Returns:
+            Dict[str, Optional[Tuple[str, List[str]]]]: The kind of root
+            element and the URLs listed in each sitemap, in discovery order;
+            None for sitemaps that could not be fetched
+        """
+        prefetched = prefetched or {}
+        results: Dict[str, Optional[Tuple[str, List[str]]]] = {}
+        queue: "asyncio.Queue[Tuple[str, int]]" = asyncio.Queue()
+
+        def enqueue(urls: Iterable[str], depth: int) -> None:
+            for url in urls:
+                if url not in results:
+                    results[url] = None
+                    queue.put_nowait((url, depth))
+
+        enqueue(sitemap_urls, 0)
+        crawl_delay = self.robots_parser.get_crawl_delay("*")
+        politeness = asyncio.Semaphore(1 if crawl_delay else MAX_CONCURRENT_FETCHES)
+
+        async def worker() -> None:
+            while True:
+                url, depth = await queue.get()
+                try:
+                    parsed = await self._crawl_sitemap(url, prefetched, politeness, crawl_delay)
+                    results[url] = parsed
+                    enqueue(_sub_sitemaps(url, parsed, depth), depth + 1)
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    # Keep the worker alive; the sitemap is reported as not fetched
+                    print(f"Error processing sitemap {url}: {e!r}")
+                finally:
+                    queue.task_done()
+
+        workers = [asyncio.ensure_future(worker()) for _ in range(MAX_CONCURRENT_FETCHES)]
+        try:
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        return results
+
+    async def _crawl_sitemap(
+        self,
+        url: str,
+        prefetched: Dict[str, bytes],
+        politeness: asyncio.Semaphore,
+        crawl_delay: Optional[float],
+    ) -> Optional[Tuple[str, List[str]]]:
+        """Fetch and parse one sitemap of a crawl_sitemaps run.
+
+        The fetch is skipped for prefetched sitemaps. Otherwise it is made
+        under the crawl's politeness limit, followed by the crawl delay.
+
+        Args:
+            url (str): The URL of the sitemap
+            prefetched (Dict[str, bytes]): Contents already downloaded
+            politeness (asyncio.Semaphore): Limits simultaneous requests
+            crawl_delay (Optional[float]): Seconds to wait after each request
+
+        Returns:
+            Optional[Tuple[str, List[str]]]: The kind of root element and the
+            URLs listed in the sitemap, None if it could not be fetched
+        """
+        content = prefetched.get(url)
+        if content is None:
+            async with politeness:
+                content = await self.fetch_sitemap(url)
+                if crawl_delay:
+                    await asyncio.sleep(crawl_delay)
+        if content is None:
+            return None
+        return await self.parse_sitemap_async(content)
+
+    def is_valid_sitemap(self, content: bytes) -> bool:
+        """Check whether content looks like a sitemap or feed.
+
+        Only the first ``VALIDATION_HEAD_SIZE`` bytes are inspected, so
+        the cost does not grow with the size of the document.
+
+        Args:
+            content (bytes): The content to check
+
+        Returns:
+            bool: True if a sitemap or feed root element is present
+        """
+        head = content[:VALIDATION_HEAD_SIZE].lstrip().lower()
+        if head.startswith(b'<!doctype html'):
+            return False
+        return any(marker in head for marker in SITEMAP_MARKERS)
+
+    def is_valid_robots_txt(self, content: str) -> bool:
+        """Check whether content looks like a robots.txt file.
+
+        Servers often answer missing files with an HTML page and a 200
+        status; such pages are rejected unless they contain directive lines.
+        Anything else is accepted, including empty and comment-only files,
+        which allow everything. Only the start of the file is read.
+
+        Args:
+            content (str): The content to check
+
+        Returns:
+            bool: False if the content is an HTML page, True otherwise
+        """
+        head = content[:VALIDATION_HEAD_SIZE]
+        if ROBOTS_DIRECTIVE_RE.search(head):
+            return True
+        start = head.lstrip('\ufeff \t\r\n')[:14].lower()
+        return not start.startswith(('<!doctype html', '<html'))
+
     def decompress_gzip(self, content: bytes) -> str:
         """Decompress gzipped content.
         
@@ -129,49 +648,134 @@ class WebsiteChecker:
             str: The decompressed content as a string
         """
         try:
-            with gzip.GzipFile(fileobj=io.BytesIO(content)) as gz:
-                return gz.read().decode('utf-8')
+            return gzip.decompress(content).decode('utf-8')
         except Exception as e:
             print(f"Error decompressing content: {e}")
             return ""
 
-    def parse_sitemap_urls(self, content: str) -> List[str]:
-        """Parse URLs from a sitemap.
-        
+    def iter_sitemap_urls(self, content: Union[str, bytes]) -> Iterator[str]:
+        """Stream URLs from a sitemap.
+
+        The document is parsed incrementally with ``lxml.etree.iterparse``
+        and each ``<url>``/``<sitemap>`` entry is released as soon as its
+        ``<loc>`` has been read, so memory stays flat on large sitemaps.
+        Duplicates are filtered out as the document is read.
+
         Args:
-            content (str): The sitemap content to parse
-            
+            content (Union[str, bytes]): The sitemap content to parse
+
+        Returns:
+            Iterator[str]: Each unique URL found in the sitemap, in document order
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return _iter_sitemap_urls(content, _sitemap_kind(content))
+
+    def parse_sitemap_urls(self, content: Union[str, bytes]) -> List[str]:
+        """Parse the unique URLs from a sitemap.
+
+        Args:
+            content (Union[str, bytes]): The sitemap content to parse
+
+        Returns:
+            List[str]: List of URLs found in the sitemap, without duplicates,
+            in order of first appearance
+        """
+        if isinstance(content, str):
+            content = content.encode('utf-8')
+        return _parse_sitemap_bytes(content)
+
+    async def parse_sitemap_urls_async(self, content: bytes) -> List[str]:
+        """Parse the unique URLs from a sitemap without blocking the event loop.
+
+        Sitemaps of at least ``PROCESS_POOL_THRESHOLD`` bytes are parsed in a
+        process pool, so several large sitemaps are parsed on separate CPU
+        cores while fetches continue. Smaller ones are parsed inline, where
+        the cost of shipping them to another process would dominate.
+
+        Args:
+            content (bytes): The sitemap content to parse
+
+        Returns:
+            List[str]: List of URLs found in the sitemap, without duplicates,
+            in order of first appearance
+        """
+        return (await self.parse_sitemap_async(content))[1]
+
+    async def parse_sitemap_async(self, content: bytes) -> Tuple[str, List[str]]:
+        """Classify a sitemap and parse its unique URLs without blocking the event loop.
+
+        Large sitemaps are parsed in a process pool, as in
+        parse_sitemap_urls_async. If a pool worker dies, the pool is replaced
+        and the sitemap is parsed once more in the new one.
+
+        Args:
+            content (bytes): The sitemap content to parse
+
         Returns:
-            List[str]: List of URLs found in the sitemap
+            Tuple[str, List[str]]: The kind of root element, as returned by
+            _sitemap_kind, and the URLs found in the sitemap
         """
-        urls = []
+        if len(content) < PROCESS_POOL_THRESHOLD:
+            return _parse_sitemap_with_kind(content)
         try:
-            soup = BeautifulSoup(content, 'xml')
-            # Check for sitemap index
-            for sitemap in soup.find_all('sitemap'):
-                loc = sitemap.find('loc')
-                if loc:
-                    urls.append(loc.text)
-            
-            # Check for regular URLs
-            for url in soup.find_all('url'):
-                loc = url.find('loc')
-                if loc:
-                    urls.append(loc.text)
-        except Exception as e:
-            print(f"Error parsing sitemap: {e}")
-        return urls
+            return await _parse_in_pool(content)
+        except BrokenProcessPool as e:
+            print(f"Sitemap parser process failed, retrying: {e}")
+            return await _parse_in_pool(content)
 
     def is_url_allowed(self, url: str) -> bool:
         """Check if a URL is allowed by robots.txt rules.
-        
+
+        robots.txt rules only look at the path, parameters, query and
+        fragment of a URL, so the checker's own parser caches verdicts on
+        that part and repeated paths skip the rule evaluation. A parser
+        assigned from outside is evaluated without the cache.
+
         Args:
             url (str): The URL to check
             
         Returns:
             bool: True if the URL is allowed, False otherwise
         """
-        return self.robots_parser.is_allowed("*", url)
+        path = _robots_path(url)
+        if isinstance(self.robots_parser, _CachingRobotsParser):
+            return self.robots_parser.is_path_allowed(path)
+        return _is_path_allowed(self.robots_parser, path)
+
+    def check_urls_allowed(self, urls: Iterable[str]) -> List[bool]:
+        """Check a batch of URLs against robots.txt rules.
+
+        Args:
+            urls (Iterable[str]): The URLs to check
+
+        Returns:
+            List[bool]: Whether each URL is allowed, in the order given
+        """
+        return [self.is_url_allowed(url) for url in urls]
+
+
+def write_listing(lines: Iterable[bytes]) -> None:
+    """Write a bulk listing to stdout in a single call.
+
+    Listings can run to tens of thousands of lines, so they are written as
+    plain ASCII-tagged bytes straight to the binary buffer instead of one
+    print() per line.
+
+    Args:
+        lines (Iterable[bytes]): The encoded lines, each ending in a newline
+    """
+    data = b''.join(lines)
+    buffer: Optional[BinaryIO] = getattr(sys.stdout, 'buffer', None)
+    if buffer is None:
+        # Replaced stdout (e.g. io.StringIO) without a binary buffer
+        sys.stdout.write(data.decode())
+        return
+    # Push out pending print() text first so the output stays in order
+    sys.stdout.flush()
+    buffer.write(data)
+    buffer.flush()
+
 
 async def main():
     """Main entry point of the script."""
@@ -180,58 +784,52 @@ async def main():
         sys.exit(1)
 
     website_url = sys.argv[1]
-    async with aiohttp.ClientSession() as session:
-        async with WebsiteChecker(website_url, session) as checker:
-            # Fetch and parse robots.txt
-            robots_txt = await checker.fetch_robots_txt()
-            if robots_txt:
-                print(f"✅ robots.txt exists at {website_url}/robots.txt")
-                print("   Last modified:", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
-                print("\nRobots.txt rules:")
-                print(robots_txt)
-            else:
-                print(f"❌ No robots.txt found at {website_url}/robots.txt")
-
-            # Find sitemaps in robots.txt
-            print("\nChecking common sitemap locations...")
-            sitemaps = await checker.find_sitemaps_in_robots()
-            
-            if not sitemaps:
-                common_locations = [
-                    '/sitemap.xml',
-                    '/sitemap_index.xml',
-                    '/wp-sitemap.xml',
-                    '/sitemap.php',
-                ]
-                for loc in common_locations:
-                    sitemap_url = website_url + loc
-                    content = await checker.fetch_sitemap(sitemap_url)
-                    if content:
+    try:
+        async with create_session() as session:
+            async with WebsiteChecker(website_url, session) as checker:
+                # Fetch and parse robots.txt
+                robots_txt = await checker.fetch_robots_txt()
+                if robots_txt is not None:
+                    print(f"✅ robots.txt exists at {checker.robots_url}")
+                    print("   Last modified:", datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+                    print("\nRobots.txt rules:")
+                    print(robots_txt)
+                else:
+                    print(f"❌ No robots.txt found at {checker.robots_url}")
+
+                # Find sitemaps in robots.txt
+                print("\nChecking common sitemap locations...")
+                sitemaps = await checker.find_sitemaps_in_robots()
+                # Sitemaps already downloaded while probing, so they aren't fetched twice
+                prefetched: Dict[str, bytes] = {}
+
+                if not sitemaps:
+                    found = await checker.find_sitemap_in_common_locations()
+                    if found:
+                        sitemap_url, prefetched[sitemap_url] = found
                         print(f"✅ Valid sitemap found at {sitemap_url}")
                         sitemaps.append(sitemap_url)
-                        break
 
-            # Process each sitemap
-            for sitemap_url in sitemaps:
-                print(f"\nAnalyzingsitemap: {sitemap_url}")
-                content = await checker.fetch_sitemap(sitemap_url)
-                if content:
-                    urls = checker.parse_sitemap_urls(content)
-                    if any(url.endswith('.xml') for url in urls):
-                        print(f"\nFound{len(urls)} sub-sitemaps:")
-                        for url in urls:
-                            if url.endswith('.xml'):
-                                print(f"🗺️  {url}")
-                                print("\nAnalyzing  sitemap:", url)
-                                sub_content = await checker.fetch_sitemap(url)
-                                if sub_content:
-                                    sub_urls = checker.parse_sitemap_urls(sub_content)
-                                    print(f"\nFound {len(sub_urls)} unique crawlable content URLs:")
-                                    for sub_url in sub_urls:
-                                        if checker.is_url_allowed(sub_url):
-                                            print(f"✅ {sub_url}")
-                                        else:
-                                            print(f"❌ {sub_url} (blocked by robots.txt)")
+                # Process every sitemap reachable from the ones found above
+                results = await checker.crawl_sitemaps(sitemaps, prefetched)
+                for sitemap_url, parsed in results.items():
+                    print(f"\nAnalyzing sitemap: {sitemap_url}")
+                    if parsed is None:
+                        continue
+                    kind, urls = parsed
+                    if kind == 'sitemapindex':
+                        print(f"\nFound {len(urls)} sub-sitemaps:")
+                        write_listing(b"[SITEMAP] " + url.encode() + b"\n" for url in urls)
+                        continue
+                    print(f"\nFound {len(urls)} unique crawlable content URLs:")
+                    verdicts = checker.check_urls_allowed(urls)
+                    write_listing(
+                        (b"[OK] " if allowed else b"[BLOCKED] ") + url.encode() + b"\n"
+                        for url, allowed in zip(urls, verdicts)
+                    )
+    finally:
+        shutdown_parse_pool()
+
 
 if __name__ == "__main__":
     asyncio.run(main())